@@ -0,0 +1,81 @@
+"""ASGI entry point serving the same game as flask_app with async handlers.
+
+The event loop only waits on clients; each request's puzzle work and
+progress store access run as one call on a bounded thread pool so slow
+connections never hold a worker.
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 8000
+
+Behind a reverse proxy, set SPELLSWA_PROXY_HOPS as for flask_app so the
+/sync attempt limit sees each client's address rather than the proxy's.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from hypercorn.middleware import ProxyFixMiddleware
+from quart import Quart, abort, render_template_string, request, jsonify, session
+
+import flask_app
+import progress_store
+from flask_app import (
+    HTML_TEMPLATE, get_page_context, link_device, proxy_hops, show_sync_code, submit,
+)
+
+app = Quart(__name__)
+# Share the key so cookies issued by either entry point stay valid
+app.secret_key = flask_app.app.secret_key
+
+def trust_proxies(app, hops):
+    """ASGI counterpart of flask_app.trust_proxies"""
+    if hops:
+        app.asgi_app = ProxyFixMiddleware(app.asgi_app, mode='legacy', trusted_hops=hops)
+
+trust_proxies(app, proxy_hops())
+
+EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('SPELLSWA_WORKERS', '4')),
+    thread_name_prefix='puzzle',
+)
+
+async def run_in_executor(func, *args):
+    # Copy the context like asyncio.to_thread so session works in the worker
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args)
+    return await loop.run_in_executor(EXECUTOR, call)
+
+@app.before_serving
+async def start_compactor():
+    progress_store.ensure_compactor()
+
+@app.route('/')
+async def index():
+    context = await run_in_executor(get_page_context, session)
+    return await render_template_string(HTML_TEMPLATE, **context)
+
+@app.route('/submit', methods=['POST'])
+async def submit_word():
+    # Flask's request.json answers non-JSON bodies with 415; match it
+    if not request.is_json:
+        abort(415)
+    data = await request.get_json()
+    word = data.get('word', '').lower()
+    return jsonify(await run_in_executor(submit, session, word))
+
+@app.route('/sync', methods=['POST'])
+async def sync_device():
+    if not request.is_json:
+        abort(415)
+    data = await request.get_json()
+    code = data.get('code') if isinstance(data, dict) else None
+    return jsonify(await run_in_executor(link_device, session, code, request.remote_addr))
+
+@app.route('/sync-code', methods=['POST'])
+async def sync_code():
+    return jsonify(await run_in_executor(show_sync_code, session))
+
+
+if __name__ == "__main__":
+    app.run(debug=True)
@@ -0,0 +1,207 @@
+"""Side-by-side load benchmark of the WSGI and ASGI entry points.
+
+Starts each server in turn on a local port and drives both with the same
+load profile: many concurrent slow clients that trickle their requests in
+small chunks, mixing page loads and word submissions.
+
+    python bench_asgi.py
+    python bench_asgi.py --clients 50,200,500 --duration 10 --trickle 0.05
+
+Every client sends the same session cookie, picked up from /sync-code
+before the load starts, so the load measures slow clients rather than
+player creation. Submissions use a word from today's puzzle.
+
+Requires uvicorn for the ASGI side.
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+# Only needed to import flask_app for today's words; the servers get their own key
+os.environ.setdefault('SPELLSWA_SECRET_KEY', secrets.token_hex(16))
+
+import flask_app
+
+HOST = '127.0.0.1'
+
+SERVERS = {
+    'wsgi (flask app.run)': [
+        sys.executable, '-c',
+        'import sys, flask_app; flask_app.app.run(host=sys.argv[1], port=int(sys.argv[2]), threaded=True)',
+        '{host}', '{port}',
+    ],
+    'asgi (uvicorn)': [
+        sys.executable, '-m', 'uvicorn', 'asgi_app:app',
+        '--host', '{host}', '--port', '{port}', '--log-level', 'warning',
+    ],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((HOST, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def fetch_cookie(port):
+    """Ask for a sync code, which always creates a player, and return its session cookie"""
+    conn = http.client.HTTPConnection(HOST, port, timeout=10)
+    try:
+        conn.request('POST', '/sync-code')
+        response = conn.getresponse()
+        response.read()
+        cookie = response.getheader('Set-Cookie')
+    finally:
+        conn.close()
+    if not cookie:
+        raise RuntimeError('server did not set a session cookie')
+    return cookie.split(';', 1)[0]
+
+
+def todays_word():
+    """A word today's puzzle accepts, so /submit runs every check"""
+    puzzle = flask_app.get_daily_puzzle()
+    return flask_app.get_valid_words(puzzle['center'], puzzle['outer'])[0]
+
+
+def build_requests(port, cookie, word):
+    body = json.dumps({'word': word}).encode()
+    get = (
+        f'GET / HTTP/1.1\r\nHost: {HOST}:{port}\r\nCookie: {cookie}\r\n'
+        f'Connection: close\r\n\r\n'
+    ).encode()
+    post = (
+        f'POST /submit HTTP/1.1\r\nHost: {HOST}:{port}\r\nCookie: {cookie}\r\n'
+        f'Connection: close\r\n'
+        f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n'
+    ).encode() + body
+    return [get, post]
+
+
+async def slow_request(port, payload, chunk, trickle):
+    """Send payload a few bytes at a time, then read the full response"""
+    reader, writer = await asyncio.open_connection(HOST, port)
+    try:
+        for i in range(0, len(payload), chunk):
+            writer.write(payload[i:i + chunk])
+            await writer.drain()
+            await asyncio.sleep(trickle)
+        response = await reader.read()
+    finally:
+        writer.close()
+    if not response.startswith(b'HTTP/1.1 200') and not response.startswith(b'HTTP/1.0 200'):
+        raise RuntimeError(response[:40])
+
+
+async def client_loop(port, requests, deadline, args, latencies, errors):
+    i = 0
+    while time.monotonic() < deadline:
+        payload = requests[i % len(requests)]
+        i += 1
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(slow_request(port, payload, args.chunk, args.trickle), args.timeout)
+        except (OSError, RuntimeError, asyncio.TimeoutError):
+            errors.append(1)
+        else:
+            latencies.append(time.monotonic() - start)
+
+
+async def run_load(port, cookie, clients, args):
+    requests = build_requests(port, cookie, todays_word())
+    latencies, errors = [], []
+    deadline = time.monotonic() + args.duration
+    await asyncio.gather(*(
+        client_loop(port, requests, deadline, args, latencies, errors)
+        for _ in range(clients)
+    ))
+    return latencies, len(errors)
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def bench_server(name, command, client_counts, args):
+    port = free_port()
+    argv = [part.format(host=HOST, port=port) for part in command]
+    # Keep the benchmark player out of the real store
+    tmp = tempfile.TemporaryDirectory()
+    env = dict(os.environ, SPELLSWA_DB=os.path.join(tmp.name, 'progress.db'),
+               SPELLSWA_SECRET_KEY=secrets.token_hex(16))
+    proc = subprocess.Popen(argv, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    rows = []
+    try:
+        wait_for_port(port)
+        cookie = fetch_cookie(port)
+        for clients in client_counts:
+            latencies, errors = asyncio.run(run_load(port, cookie, clients, args))
+            rows.append((
+                name, clients, len(latencies) / args.duration, errors,
+                percentile(latencies, 50), percentile(latencies, 95),
+            ))
+    finally:
+        proc.terminate()
+        proc.wait()
+        tmp.cleanup()
+    return rows
+
+
+def format_table(rows):
+    header = ('server', 'clients', 'req/s', 'errors', 'p50 (ms)', 'p95 (ms)')
+    lines = [header]
+    for name, clients, rps, errors, p50, p95 in rows:
+        lines.append((name, str(clients), f'{rps:.1f}', str(errors), f'{p50 * 1000:.0f}', f'{p95 * 1000:.0f}'))
+    widths = [max(len(line[i]) for line in lines) for i in range(len(header))]
+    out = []
+    for i, line in enumerate(lines):
+        out.append('  '.join(cell.ljust(widths[j]) if j == 0 else cell.rjust(widths[j])
+                             for j, cell in enumerate(line)))
+        if i == 0:
+            out.append('  '.join('-' * w for w in widths))
+    return '\n'.join(out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--clients', default='50,200',
+                        help='comma separated concurrency levels')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per level')
+    parser.add_argument('--chunk', type=int, default=16, help='bytes sent per write')
+    parser.add_argument('--trickle', type=float, default=0.02,
+                        help='seconds between writes, simulating a slow client')
+    parser.add_argument('--timeout', type=float, default=30.0, help='per request timeout')
+    args = parser.parse_args(argv)
+
+    client_counts = [int(c) for c in args.clients.split(',') if c]
+    rows = []
+    for name, command in SERVERS.items():
+        rows.extend(bench_server(name, command, client_counts, args))
+    print(format_table(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
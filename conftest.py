@@ -0,0 +1,15 @@
+import os
+
+import pytest
+
+# flask_app refuses to import without a fixed signing key
+os.environ.setdefault('SPELLSWA_SECRET_KEY', 'test-secret-key')
+
+import progress_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Point progress_store at an empty database for the test"""
+    monkeypatch.setattr(progress_store, 'DB_PATH', str(tmp_path / 'progress.db'))
+    return progress_store
@@ -1,9 +1,42 @@
 from flask import Flask, render_template_string, request, jsonify, session
-import secrets
+from werkzeug.middleware.proxy_fix import ProxyFix
+import os
 from datetime import datetime, timezone
 
+import progress_store
+
+def load_secret_key():
+    """Cookie signing key from SPELLSWA_SECRET_KEY or the file named by SPELLSWA_SECRET_KEY_FILE.
+
+    The player's identity lives in the signed cookie, so the key has to stay
+    the same across restarts and workers; refuse to start without one.
+    """
+    key = os.environ.get('SPELLSWA_SECRET_KEY')
+    path = os.environ.get('SPELLSWA_SECRET_KEY_FILE')
+    if not key and path:
+        with open(path) as f:
+            key = f.read().strip()
+    if not key:
+        raise RuntimeError('Set SPELLSWA_SECRET_KEY or SPELLSWA_SECRET_KEY_FILE to a fixed secret key')
+    return key
+
+def proxy_hops():
+    """Number of reverse proxies in front of the app, from SPELLSWA_PROXY_HOPS.
+
+    Behind a proxy every request arrives from the proxy's address, which
+    would make the /sync attempt limit one limit shared by every player.
+    Set this to the number of proxies that append to X-Forwarded-For.
+    """
+    return int(os.environ.get('SPELLSWA_PROXY_HOPS', '0'))
+
+def trust_proxies(app, hops):
+    """Take request.remote_addr from X-Forwarded-For written by hops proxies"""
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops)
+
 app = Flask(__name__)
-app.secret_key = secrets.token_hex(16)
+app.secret_key = load_secret_key()
+trust_proxies(app, proxy_hops())
 
 # Kiswahili word list
 KISWAHILI_WORDS = [
@@ -73,6 +106,59 @@ def get_rank(score, total_possible):
     else:
         return "Mwanzo"
 
+def get_progress(found_count, total_possible):
+    return min(10, int((found_count / max(1, total_possible)) * 10))
+
+def get_player(session):
+    """Return (player_id, sync_code) for this browser, or (None, None) if it has no player yet"""
+    return session.get('player_id'), session.get('sync_code')
+
+def ensure_player(session):
+    """Return (player_id, sync_code) for this browser, creating a player if needed.
+
+    Players are only created once there is something to keep (an accepted
+    word or a sync code the player asked to see), not for every visitor.
+    Words found today under the old cookie-only progress are carried over.
+    """
+    if 'player_id' not in session:
+        player_id, sync_code = progress_store.create_player()
+        if session.get('date') == get_today_key() and session.get('found_words'):
+            progress_store.record_words(player_id, session['date'], session['found_words'])
+        session.clear()
+        session['player_id'] = player_id
+        session['sync_code'] = sync_code
+    return session['player_id'], session['sync_code']
+
+def load_session_progress(session):
+    """Return today's (found_words, score) for this browser"""
+    player_id, _ = get_player(session)
+    if player_id is not None:
+        return progress_store.load_progress(player_id, get_today_key())
+    if session.get('date') == get_today_key():
+        # Cookie-only progress from before sync codes; ensure_player moves it over
+        return list(session.get('found_words', [])), session.get('score', 0)
+    return [], 0
+
+def check_word(word, puzzle, found_words):
+    """Return the error message for a submitted word, or None if it is accepted"""
+    if word in found_words:
+        return '✗ Tayari umeandika neno hili!'
+
+    if len(word) < 4:
+        return '✗ Neno liwe na herufi 4 au zaidi!'
+
+    if puzzle['center'].lower() not in word:
+        return f'✗ Lazima utumie herufi "{puzzle["center"]}"!'
+
+    all_letters = set([puzzle['center'].lower()] + [l.lower() for l in puzzle['outer']])
+    if not all(char in all_letters for char in word):
+        return '✗ Tumia herufi zilizopo tu!'
+
+    if word not in KISWAHILI_WORDS:
+        return '✗ Neno si sahihi!'
+
+    return None
+
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="sw">
@@ -369,6 +455,26 @@ HTML_TEMPLATE = """
         button:hover { background: #f5f5f5; border-color: #999; }
         .btn-enter { background: #000; color: white; border-color: #000; }
         .btn-enter:hover { background: #333; }
+        .sync {
+            margin-top: 30px;
+            padding-top: 20px;
+            border-top: 1px solid #e5e7eb;
+            text-align: center;
+            color: #555;
+            font-size: 0.9em;
+        }
+        .sync-code { font-weight: bold; color: #000; letter-spacing: 2px; }
+        .sync-code button { padding: 4px 14px; font-size: 0.9em; letter-spacing: normal; }
+        .sync-form { display: flex; gap: 10px; justify-content: center; margin-top: 10px; }
+        .sync-form input {
+            padding: 10px 16px;
+            font-size: 1em;
+            border: 2px solid #ddd;
+            border-radius: 25px;
+            width: 140px;
+            text-transform: uppercase;
+            text-align: center;
+        }
         .message {
             text-align: center;
             padding: 10px;
@@ -477,6 +583,18 @@ HTML_TEMPLATE = """
                 <button onclick="shuffle()">🔄 Changanya</button>
                 <button class="btn-enter" onclick="submitWord()">Wasilisha</button>
             </div>
+
+            <div class="sync">
+                <div>Msimbo wako wa kusawazisha:
+                    <span class="sync-code" id="syncCodeValue">
+                        {% if sync_code %}{{ sync_code }}{% else %}<button onclick="showSyncCode()">Onyesha</button>{% endif %}
+                    </span>
+                </div>
+                <div class="sync-form">
+                    <input id="syncCode" maxlength="6" placeholder="Msimbo">
+                    <button onclick="syncDevice()">Unganisha kifaa</button>
+                </div>
+            </div>
         </div>
     </div>
 
@@ -605,6 +723,30 @@ HTML_TEMPLATE = """
             });
         }
 
+        function showSyncCode() {
+            fetch('/sync-code', {method: 'POST'})
+            .then(r => r.json())
+            .then(data => {
+                document.getElementById('syncCodeValue').textContent = data.code;
+            });
+        }
+
+        function syncDevice() {
+            fetch('/sync', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({code: document.getElementById('syncCode').value})
+            })
+            .then(r => r.json())
+            .then(data => {
+                if (data.success) {
+                    window.location.reload();
+                } else {
+                    showMessage(data.message, 'error');
+                }
+            });
+        }
+
         function updateProgress(progress) {
             const progressDiv = document.getElementById('progress');
             progressDiv.innerHTML = '';
@@ -616,6 +758,9 @@ HTML_TEMPLATE = """
         }
 
         document.addEventListener('keydown', (e) => {
+            if (e.target.tagName === 'INPUT') {
+                return;
+            }
             const key = e.key.toLowerCase();
             const allLetters = [centerLetter, ...{{ outer | tojson }}].map(l => l.toLowerCase());
 
@@ -634,83 +779,112 @@ HTML_TEMPLATE = """
 </html>
 """
 
-@app.route('/')
-def index():
-    today_key = get_today_key()
-
-    if session.get('date') != today_key:
-        session.clear()
-        session['date'] = today_key
-        session['found_words'] = []
-        session['score'] = 0
+def get_page_context(session):
+    """Template values for the game page"""
+    _, sync_code = get_player(session)
+    found_words, score = load_session_progress(session)
 
     puzzle = get_daily_puzzle()
     valid_words = get_valid_words(puzzle['center'], puzzle['outer'])
-    rank = get_rank(session['score'], len(valid_words))
-    progress = min(10, int((len(session['found_words']) / max(1, len(valid_words))) * 10))
+    rank = get_rank(score, len(valid_words))
+    progress = get_progress(len(found_words), len(valid_words))
 
-    return render_template_string(
-        HTML_TEMPLATE,
+    return dict(
         center=puzzle['center'],
         outer=puzzle['outer'],
-        found_words=session['found_words'],
-        found_count=len(session['found_words']),
-        score=session['score'],
+        found_words=found_words,
+        found_count=len(found_words),
+        score=score,
         total_possible=len(valid_words),
         rank=rank,
         progress=progress,
+        sync_code=sync_code,
         today_date=datetime.now(timezone.utc).strftime('%d %B %Y')
     )
 
-@app.route('/submit', methods=['POST'])
-def submit_word():
-    today_key = get_today_key()
-
-    if session.get('date') != today_key:
-        session.clear()
-        session['date'] = today_key
-        session['found_words'] = []
-        session['score'] = 0
-
-    data = request.json
-    word = data.get('word', '').lower()
+def submit(session, word):
+    """Check and record a submitted word, returning the JSON response body"""
     puzzle = get_daily_puzzle()
 
-    if word in session.get('found_words', []):
-        return jsonify({'success': False, 'message': '✗ Tayari umeandika neno hili!'})
+    found_words, score = load_session_progress(session)
+    error = check_word(word, puzzle, found_words)
+    if error:
+        return {'success': False, 'message': error}
 
-    if len(word) < 4:
-        return jsonify({'success': False, 'message': '✗ Neno liwe na herufi 4 au zaidi!'})
-
-    if puzzle['center'].lower() not in word:
-        return jsonify({'success': False, 'message': f'✗ Lazima utumie herufi "{puzzle["center"]}"!'})
-
-    all_letters = set([puzzle['center'].lower()] + [l.lower() for l in puzzle['outer']])
-    if not all(char in all_letters for char in word):
-        return jsonify({'success': False, 'message': '✗ Tumia herufi zilizopo tu!'})
-
-    if word not in KISWAHILI_WORDS:
-        return jsonify({'success': False, 'message': '✗ Neno si sahihi!'})
-
-    if 'found_words' not in session:
-        session['found_words'] = []
-    session['found_words'].append(word)
-    session['score'] = session.get('score', 0) + len(word)
-    session.modified = True
+    player_id, _ = ensure_player(session)
+    found_words, score, added = progress_store.record_word(player_id, get_today_key(), word)
+    if not added:
+        # Another device got there first
+        return {'success': False, 'message': '✗ Tayari umeandika neno hili!'}
 
     valid_words = get_valid_words(puzzle['center'], puzzle['outer'])
-    rank = get_rank(session['score'], len(valid_words))
-    progress = min(10, int((len(session['found_words']) / max(1, len(valid_words))) * 10))
+    rank = get_rank(score, len(valid_words))
+    progress = get_progress(len(found_words), len(valid_words))
 
-    return jsonify({
+    return {
         'success': True,
         'message': f'✓ Vizuri! +{len(word)} alama',
-        'found_count': len(session['found_words']),
-        'score': session['score'],
+        'found_count': len(found_words),
+        'score': score,
         'rank': rank,
         'progress': progress
-    })
+    }
+
+def show_sync_code(session):
+    """Return the JSON response body carrying this browser's sync code"""
+    _, sync_code = ensure_player(session)
+    return {'success': True, 'code': sync_code}
+
+def link_device(session, code, client):
+    """Point this browser at the player owning code, returning the JSON response body.
+
+    Words this browser found today are merged into that player first.
+    client identifies the caller (its address) for the failed attempt limit.
+    """
+    if progress_store.sync_blocked(client):
+        return {'success': False, 'message': '✗ Majaribio mengi mno! Jaribu tena baadaye.'}
+
+    player_id = progress_store.find_player(code)
+    if player_id is None:
+        progress_store.record_sync_failure(client)
+        return {'success': False, 'message': '✗ Msimbo si sahihi!'}
+
+    # Keep what this browser found today rather than dropping it on the switch
+    current_player, _ = get_player(session)
+    if player_id != current_player:
+        found_words, _ = load_session_progress(session)
+        if found_words:
+            progress_store.record_words(player_id, get_today_key(), found_words)
+
+    session.clear()
+    session['player_id'] = player_id
+    session['sync_code'] = progress_store.normalize_sync_code(code)
+    return {'success': True, 'message': '✓ Kifaa kimeunganishwa!'}
+
+@app.before_request
+def start_compactor():
+    # Runs under any WSGI server; the reloader's parent never serves, so it never compacts
+    progress_store.ensure_compactor()
+
+@app.route('/')
+def index():
+    return render_template_string(HTML_TEMPLATE, **get_page_context(session))
+
+@app.route('/submit', methods=['POST'])
+def submit_word():
+    data = request.json
+    word = data.get('word', '').lower()
+    return jsonify(submit(session, word))
+
+@app.route('/sync', methods=['POST'])
+def sync_device():
+    data = request.json
+    code = data.get('code') if isinstance(data, dict) else None
+    return jsonify(link_device(session, code, request.remote_addr))
 
+@app.route('/sync-code', methods=['POST'])
+def sync_code():
+    return jsonify(show_sync_code(session))
 
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,286 @@
+"""Player progress shared across devices.
+
+Each player has a short sync code that links any number of browsers to the
+same progress. Accepted words are appended to an event log per
+(player, day); the same transaction folds them into a snapshot row, so
+loading progress is a single primary key read. A background job deletes
+log entries that old snapshots already cover.
+
+Both entry points start that job by themselves, once per serving process:
+flask_app on its first request (so gunicorn and other WSGI servers get it
+too), asgi_app before serving. It can also be run by hand or from cron:
+
+    python progress_store.py compact
+"""
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.environ.get('SPELLSWA_DB', 'progress.db')
+
+# No 0/O or 1/I so codes survive being read out or typed on a phone
+SYNC_ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+SYNC_CODE_LENGTH = 6
+
+# Failed /sync attempts allowed per client before it has to wait
+SYNC_ATTEMPT_LIMIT = 10
+SYNC_ATTEMPT_WINDOW = 15 * 60
+
+COMPACT_INTERVAL = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    player_id TEXT PRIMARY KEY,
+    sync_code TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS word_events (
+    event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    player_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    word TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS word_events_player_day
+    ON word_events (player_id, day, event_id);
+CREATE TABLE IF NOT EXISTS snapshots (
+    player_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    found_words TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    last_event_id INTEGER NOT NULL,
+    PRIMARY KEY (player_id, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_failures (
+    client TEXT NOT NULL,
+    failed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sync_failures_client
+    ON sync_failures (client, failed_at);
+"""
+
+_initialized = set()
+_init_lock = threading.Lock()
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+@contextmanager
+def connect():
+    """Open a connection to DB_PATH, creating the schema on first use"""
+    conn = sqlite3.connect(DB_PATH, timeout=10, isolation_level=None)
+    try:
+        with _init_lock:
+            if DB_PATH not in _initialized:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.executescript(SCHEMA)
+                _initialized.add(DB_PATH)
+        yield conn
+    finally:
+        conn.close()
+
+@contextmanager
+def transaction(conn):
+    """Write transaction that takes the lock up front"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+def normalize_sync_code(code):
+    """Return code in canonical form, or None if it cannot be a sync code"""
+    if not isinstance(code, str):
+        return None
+    code = ''.join(code.split()).upper()
+    if len(code) != SYNC_CODE_LENGTH:
+        return None
+    return code
+
+def create_player():
+    """Create a player and return (player_id, sync_code)"""
+    player_id = secrets.token_hex(16)
+    with connect() as conn:
+        while True:
+            sync_code = ''.join(secrets.choice(SYNC_ALPHABET) for _ in range(SYNC_CODE_LENGTH))
+            try:
+                conn.execute(
+                    'INSERT INTO players (player_id, sync_code, created_at) VALUES (?, ?, ?)',
+                    (player_id, sync_code, _now()))
+            except sqlite3.IntegrityError:
+                continue
+            return player_id, sync_code
+
+def find_player(sync_code):
+    """Return the player_id linked to sync_code, or None"""
+    sync_code = normalize_sync_code(sync_code)
+    if sync_code is None:
+        return None
+    with connect() as conn:
+        row = conn.execute(
+            'SELECT player_id FROM players WHERE sync_code = ?',
+            (sync_code,)).fetchone()
+    return row[0] if row else None
+
+def sync_blocked(client):
+    """True if client has used up its failed sync attempts for now"""
+    with connect() as conn:
+        (failures,) = conn.execute(
+            'SELECT COUNT(*) FROM sync_failures WHERE client = ? AND failed_at > ?',
+            (client, time.time() - SYNC_ATTEMPT_WINDOW)).fetchone()
+    return failures >= SYNC_ATTEMPT_LIMIT
+
+def record_sync_failure(client):
+    with connect() as conn:
+        conn.execute(
+            'INSERT INTO sync_failures (client, failed_at) VALUES (?, ?)',
+            (client, time.time()))
+
+def load_progress(player_id, day):
+    """Return (found_words, score) for the player on day"""
+    with connect() as conn:
+        row = conn.execute(
+            'SELECT found_words, score FROM snapshots WHERE player_id = ? AND day = ?',
+            (player_id, day)).fetchone()
+    if row is None:
+        return [], 0
+    return json.loads(row[0]), row[1]
+
+def _fold(found_words, score, words):
+    """Apply accepted words to a snapshot, ignoring repeats from other devices"""
+    added = []
+    for word in words:
+        if word not in found_words:
+            found_words.append(word)
+            score += len(word)
+            added.append(word)
+    return found_words, score, added
+
+def record_words(player_id, day, words):
+    """Append words to the log and the snapshot.
+
+    Returns (found_words, score, added) where added lists the words that
+    were new for the day.
+    """
+    with connect() as conn, transaction(conn):
+        row = conn.execute(
+            'SELECT found_words, score FROM snapshots WHERE player_id = ? AND day = ?',
+            (player_id, day)).fetchone()
+        found_words, score = (json.loads(row[0]), row[1]) if row else ([], 0)
+        found_words, score, added = _fold(found_words, score, words)
+        if not added:
+            return found_words, score, added
+
+        created_at = _now()
+        last_event_id = None
+        for word in added:
+            last_event_id = conn.execute(
+                'INSERT INTO word_events (player_id, day, word, created_at) VALUES (?, ?, ?, ?)',
+                (player_id, day, word, created_at)).lastrowid
+        conn.execute(
+            'INSERT OR REPLACE INTO snapshots (player_id, day, found_words, score, last_event_id) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (player_id, day, json.dumps(found_words), score, last_event_id))
+    return found_words, score, added
+
+def record_word(player_id, day, word):
+    """Append one word; returns (found_words, score, added) like record_words"""
+    found_words, score, added = record_words(player_id, day, [word])
+    return found_words, score, bool(added)
+
+def rebuild_snapshot(player_id, day):
+    """Fold any log entries newer than the snapshot into it"""
+    with connect() as conn, transaction(conn):
+        row = conn.execute(
+            'SELECT found_words, score, last_event_id FROM snapshots WHERE player_id = ? AND day = ?',
+            (player_id, day)).fetchone()
+        found_words, score, last_event_id = (json.loads(row[0]), row[1], row[2]) if row else ([], 0, 0)
+        events = conn.execute(
+            'SELECT event_id, word FROM word_events '
+            'WHERE player_id = ? AND day = ? AND event_id > ? ORDER BY event_id',
+            (player_id, day, last_event_id)).fetchall()
+        if not events:
+            return found_words, score
+        found_words, score, _ = _fold(found_words, score, [word for _, word in events])
+        conn.execute(
+            'INSERT OR REPLACE INTO snapshots (player_id, day, found_words, score, last_event_id) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (player_id, day, json.dumps(found_words), score, events[-1][0]))
+    return found_words, score
+
+def compact(before_day):
+    """Drop log entries for days before before_day that snapshots already cover.
+
+    Returns the number of events removed.
+    """
+    with connect() as conn:
+        stale = conn.execute(
+            'SELECT DISTINCT e.player_id, e.day FROM word_events e '
+            'LEFT JOIN snapshots s ON s.player_id = e.player_id AND s.day = e.day '
+            'WHERE e.day < ? AND (s.last_event_id IS NULL OR e.event_id > s.last_event_id)',
+            (before_day,)).fetchall()
+    for player_id, day in stale:
+        rebuild_snapshot(player_id, day)
+
+    with connect() as conn, transaction(conn):
+        cursor = conn.execute(
+            'DELETE FROM word_events WHERE day < ? AND event_id <= ('
+            '    SELECT last_event_id FROM snapshots s'
+            '    WHERE s.player_id = word_events.player_id AND s.day = word_events.day)',
+            (before_day,))
+        conn.execute(
+            'DELETE FROM sync_failures WHERE failed_at <= ?',
+            (time.time() - SYNC_ATTEMPT_WINDOW,))
+    return cursor.rowcount
+
+def _compact_loop(interval, stop):
+    while not stop.wait(interval):
+        try:
+            compact(datetime.now(timezone.utc).strftime('%Y-%m-%d'))
+        except Exception:
+            # e.g. "database is locked" under write load; try again next interval
+            logger.exception('progress compaction failed')
+
+def start_compactor(interval=COMPACT_INTERVAL):
+    """Run compact() every interval seconds on a daemon thread.
+
+    Returns an Event that stops the thread when set.
+    """
+    stop = threading.Event()
+    thread = threading.Thread(target=_compact_loop, args=(interval, stop),
+                              name='progress-compactor', daemon=True)
+    thread.start()
+    return stop
+
+_compactor_pid = None
+_compactor_lock = threading.Lock()
+
+def ensure_compactor():
+    """Start the compactor unless this process already runs one.
+
+    Keyed on the pid because threads do not survive a fork, e.g. into
+    workers of a preloading WSGI server.
+    """
+    global _compactor_pid
+    with _compactor_lock:
+        if _compactor_pid != os.getpid():
+            start_compactor()
+            _compactor_pid = os.getpid()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ['compact']:
+        sys.exit('usage: python progress_store.py compact')
+    removed = compact(datetime.now(timezone.utc).strftime('%Y-%m-%d'))
+    print(f'removed {removed} compacted events')
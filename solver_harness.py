@@ -0,0 +1,421 @@
+"""Differential correctness and timing harness for the word solver.
+
+Checks faster versions of get_valid_words(), get_rank() and the /submit
+checks against the reference code in flask_app on randomly generated
+lexicons and puzzles, then times both across lexicon sizes. /submit is
+checked through the WSGI entry point, and through the ASGI one as well
+when quart is installed.
+
+    python solver_harness.py
+    python solver_harness.py --seed 7 --cases 500 --sizes 100,1000,10000
+
+Exits non-zero if any candidate disagrees with the reference.
+"""
+import argparse
+import asyncio
+import bisect
+import os
+import random
+import secrets
+import string
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+# Only in-process test clients sign cookies here, so any key will do
+os.environ.setdefault('SPELLSWA_SECRET_KEY', secrets.token_hex(16))
+
+import flask_app
+import progress_store
+
+try:
+    import asgi_app
+except ImportError:
+    # The solver checks do not need the ASGI stack
+    asgi_app = None
+
+ALPHABET = string.ascii_lowercase
+
+# Thresholds from get_rank(), lowest first
+RANK_THRESHOLDS = [8, 15, 25, 40, 50, 70, 100]
+RANK_NAMES = ["Mwanzo", "Mwanzo Mzuri", "Mbaya si", "Vizuri", "Mzuri", "Hodari", "Bingwa", "Bingwa Mkuu"]
+
+
+# ---------------------------------------------------------------------------
+# Optimized candidates
+# ---------------------------------------------------------------------------
+
+class FastSolver:
+    """Lexicon indexed once so puzzle lookups avoid rescanning every word"""
+
+    def __init__(self, lexicon):
+        self.lexicon = list(lexicon)
+        self.word_set = frozenset(self.lexicon)
+        # Keep duplicates and order: the reference returns both
+        self.entries = [(word, frozenset(word)) for word in self.lexicon if len(word) >= 4]
+        self._cache = {}
+
+    def valid_words(self, center, outer_letters):
+        center = center.lower()
+        all_letters = frozenset([center] + [l.lower() for l in outer_letters])
+        key = (center, all_letters)
+        if key not in self._cache:
+            self._cache[key] = [
+                word for word, letters in self.entries
+                if center in letters and letters <= all_letters
+            ]
+        return list(self._cache[key])
+
+    def check_word(self, word, puzzle, found_words):
+        """Return the /submit error message for word, or None if accepted"""
+        if word in found_words:
+            return '✗ Tayari umeandika neno hili!'
+        if len(word) < 4:
+            return '✗ Neno liwe na herufi 4 au zaidi!'
+        if puzzle['center'].lower() not in word:
+            return f'✗ Lazima utumie herufi "{puzzle["center"]}"!'
+        all_letters = {puzzle['center'].lower()} | {l.lower() for l in puzzle['outer']}
+        if not set(word) <= all_letters:
+            return '✗ Tumia herufi zilizopo tu!'
+        if word not in self.word_set:
+            return '✗ Neno si sahihi!'
+        return None
+
+
+def fast_rank(score, total_possible):
+    if total_possible == 0:
+        return "Beginner"
+    # Same expression as the reference so float rounding matches exactly
+    percentage = (score / (total_possible * 5)) * 100
+    return RANK_NAMES[bisect.bisect_right(RANK_THRESHOLDS, percentage)]
+
+
+# ---------------------------------------------------------------------------
+# Reference wrappers
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def reference_lexicon(lexicon, puzzle=None):
+    """Point the reference functions in flask_app at a generated lexicon"""
+    with mock.patch.object(flask_app, 'KISWAHILI_WORDS', list(lexicon)):
+        if puzzle is None:
+            yield
+        else:
+            with mock.patch.object(flask_app, 'get_daily_puzzle', lambda: puzzle):
+                yield
+
+
+@contextmanager
+def scratch_progress_store():
+    """Keep reference /submit calls out of the real progress database"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with mock.patch.object(progress_store, 'DB_PATH', os.path.join(tmp, 'progress.db')):
+            yield
+
+
+def reference_submit(client, word, found_words):
+    """POST word to /submit for a new player who already found found_words"""
+    player_id, sync_code = progress_store.create_player()
+    progress_store.record_words(player_id, flask_app.get_today_key(), found_words)
+    with client.session_transaction() as sess:
+        sess['player_id'] = player_id
+        sess['sync_code'] = sync_code
+    data = client.post('/submit', json={'word': word}).get_json()
+    return None if data['success'] else data['message']
+
+
+class AsgiClient:
+    """Blocking wrapper around the Quart test client for asgi_app"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.client = asgi_app.app.test_client()
+
+    def close(self):
+        self.loop.close()
+
+    async def _submit(self, word, found_words):
+        player_id, sync_code = progress_store.create_player()
+        progress_store.record_words(player_id, flask_app.get_today_key(), found_words)
+        async with self.client.session_transaction() as sess:
+            sess['player_id'] = player_id
+            sess['sync_code'] = sync_code
+        response = await self.client.post('/submit', json={'word': word})
+        data = await response.get_json()
+        return None if data['success'] else data['message']
+
+    def submit(self, word, found_words):
+        """POST word to the ASGI /submit, like reference_submit"""
+        return self.loop.run_until_complete(self._submit(word, found_words))
+
+    async def _post_status(self, path, data, headers):
+        response = await self.client.post(path, data=data, headers=headers)
+        return response.status_code
+
+    def post_status(self, path, data, headers):
+        return self.loop.run_until_complete(self._post_status(path, data, headers))
+
+
+# ---------------------------------------------------------------------------
+# Generators
+# ---------------------------------------------------------------------------
+
+def random_puzzle(rng):
+    letters = rng.sample(ALPHABET, 7)
+    center = letters[0]
+    outer = letters[1:]
+    if rng.random() < 0.5:
+        center = center.upper()
+        outer = [l.upper() for l in outer]
+    elif rng.random() < 0.2:
+        outer = [l.upper() if rng.random() < 0.5 else l for l in outer]
+    return {"center": center, "outer": outer}
+
+
+def random_word(rng, puzzle):
+    """A word biased toward the puzzle letters, hitting each rejection path"""
+    letters = [puzzle['center'].lower()] + [l.lower() for l in puzzle['outer']]
+    roll = rng.random()
+    length = rng.randint(1, 3) if roll < 0.1 else rng.randint(4, 9)
+    if roll < 0.2:
+        # Foreign letters
+        return ''.join(rng.choice(ALPHABET) for _ in range(length))
+    if roll < 0.3:
+        # Missing center letter
+        return ''.join(rng.choice(letters[1:]) for _ in range(length))
+    word = [rng.choice(letters) for _ in range(length)]
+    word[rng.randrange(length)] = letters[0]
+    return ''.join(word)
+
+
+def random_lexicon(rng, size, puzzle):
+    lexicon = [random_word(rng, puzzle) for _ in range(size)]
+    for _ in range(max(1, size // 20)):
+        roll = rng.random()
+        if roll < 0.4 and lexicon:
+            lexicon.append(rng.choice(lexicon))
+        elif roll < 0.7 and lexicon:
+            lexicon.append(rng.choice(lexicon).upper())
+        else:
+            lexicon.append(random_word(rng, puzzle)[:3])
+    rng.shuffle(lexicon)
+    return lexicon
+
+
+def random_submissions(rng, lexicon, puzzle, count):
+    """Guesses mixing lexicon entries, uppercase input and random words"""
+    guesses = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.4 and lexicon:
+            guess = rng.choice(lexicon)
+        elif roll < 0.5 and lexicon:
+            guess = rng.choice(lexicon).upper()
+        elif roll < 0.55:
+            guess = ''
+        else:
+            guess = random_word(rng, puzzle)
+        guesses.append(guess)
+    return guesses
+
+
+# ---------------------------------------------------------------------------
+# Differential checks
+# ---------------------------------------------------------------------------
+
+def check_case(rng, client, asgi_client, size):
+    """Compare every candidate to the reference on one lexicon/puzzle pair"""
+    failures = []
+    puzzle = random_puzzle(rng)
+    lexicon = random_lexicon(rng, size, puzzle)
+    solver = FastSolver(lexicon)
+
+    with reference_lexicon(lexicon, puzzle):
+        expected = flask_app.get_valid_words(puzzle['center'], puzzle['outer'])
+        actual = solver.valid_words(puzzle['center'], puzzle['outer'])
+        if expected != actual:
+            failures.append(('get_valid_words', puzzle, expected, actual))
+
+        total = len(expected)
+        for score in [0, 1, rng.randint(0, 5 * total + 5), 5 * total, 5 * total + 1]:
+            expected_rank = flask_app.get_rank(score, total)
+            actual_rank = fast_rank(score, total)
+            if expected_rank != actual_rank:
+                failures.append(('get_rank', (score, total), expected_rank, actual_rank))
+
+        found = []
+        for guess in random_submissions(rng, lexicon, puzzle, 20):
+            word = guess.lower()
+            expected_msg = reference_submit(client, guess, found)
+            actual_msg = solver.check_word(word, puzzle, found)
+            if expected_msg != actual_msg:
+                failures.append(('submit', (puzzle, guess, list(found)), expected_msg, actual_msg))
+            if asgi_client is not None:
+                asgi_msg = asgi_client.submit(guess, found)
+                if expected_msg != asgi_msg:
+                    failures.append(('asgi submit', (puzzle, guess, list(found)), expected_msg, asgi_msg))
+            if actual_msg is None:
+                found.append(word)
+    return failures
+
+
+# Bodies the routes must turn away the same way on both entry points
+NON_JSON_BODIES = [
+    ('hello', {'Content-Type': 'text/plain'}),
+    ('word=mama', {'Content-Type': 'application/x-www-form-urlencoded'}),
+    ('', {}),
+    ('{"word": ', {'Content-Type': 'application/json'}),
+]
+
+
+def check_non_json(client, asgi_client):
+    """Compare ASGI status codes for non-JSON bodies with the Flask routes"""
+    failures = []
+    for path in ['/submit', '/sync']:
+        for data, headers in NON_JSON_BODIES:
+            expected = client.post(path, data=data, headers=headers).status_code
+            actual = asgi_client.post_status(path, data, headers)
+            if expected != actual:
+                failures.append(('asgi non-json', (path, data, headers), expected, actual))
+    return failures
+
+
+def check_rank_grid():
+    """Exhaustive get_rank() comparison over small scores and totals"""
+    failures = []
+    for total in range(0, 60):
+        for score in range(0, 5 * total + 10):
+            if flask_app.get_rank(score, total) != fast_rank(score, total):
+                failures.append(('get_rank', (score, total),
+                                 flask_app.get_rank(score, total), fast_rank(score, total)))
+    return failures
+
+
+def run_differential(seed, cases, max_size=200, asgi=None):
+    """Return every mismatch found; asgi=None checks asgi_app only if it imports"""
+    if asgi is None:
+        asgi = asgi_app is not None
+    rng = random.Random(seed)
+    client = flask_app.app.test_client()
+    asgi_client = AsgiClient() if asgi else None
+    failures = check_rank_grid()
+    try:
+        if asgi_client is not None:
+            failures.extend(check_non_json(client, asgi_client))
+        for _ in range(cases):
+            failures.extend(check_case(rng, client, asgi_client, rng.randint(0, max_size)))
+    finally:
+        if asgi_client is not None:
+            asgi_client.close()
+    return failures
+
+
+# ---------------------------------------------------------------------------
+# Timings
+# ---------------------------------------------------------------------------
+
+def best_of(fn, repeat=5, number=1):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def time_size(rng, size, client):
+    """Time reference and candidate for each function on one lexicon size"""
+    puzzle = random_puzzle(rng)
+    lexicon = random_lexicon(rng, size, puzzle)
+    guesses = random_submissions(rng, lexicon, puzzle, 50)
+    solver = FastSolver(lexicon)
+    center, outer = puzzle['center'], puzzle['outer']
+    scores = [(rng.randint(0, 500), rng.randint(0, 100)) for _ in range(1000)]
+
+    def ref_check():
+        for guess in guesses:
+            flask_app.check_word(guess.lower(), puzzle, [])
+
+    def fast_check():
+        for guess in guesses:
+            solver.check_word(guess.lower(), puzzle, [])
+
+    def route_submit():
+        for guess in guesses:
+            reference_submit(client, guess, [])
+
+    rows = []
+    with reference_lexicon(lexicon, puzzle):
+        reference_words = best_of(lambda: flask_app.get_valid_words(center, outer))
+        # Cold includes building the index, warm is a cached puzzle lookup
+        rows.append(('get_valid_words cold', size, reference_words,
+                     best_of(lambda: FastSolver(lexicon).valid_words(center, outer))))
+        rows.append(('get_valid_words warm', size, reference_words,
+                     best_of(lambda: solver.valid_words(center, outer))))
+        rows.append(('get_rank x1000', size,
+                     best_of(lambda: [flask_app.get_rank(s, t) for s, t in scores]),
+                     best_of(lambda: [fast_rank(s, t) for s, t in scores])))
+        rows.append(('check_word x50', size,
+                     best_of(ref_check), best_of(fast_check)))
+        # Full request cost for context; there is no candidate to compare
+        rows.append(('/submit x50 (route)', size, best_of(route_submit, repeat=3), None))
+    return rows
+
+
+def run_timings(seed, sizes):
+    rng = random.Random(seed)
+    client = flask_app.app.test_client()
+    rows = []
+    for size in sizes:
+        rows.extend(time_size(rng, size, client))
+    return rows
+
+
+def format_table(rows):
+    header = ('function', 'lexicon', 'reference (ms)', 'optimized (ms)', 'speedup')
+    lines = [header]
+    for name, size, ref, fast in rows:
+        if fast is None:
+            lines.append((name, str(size), f'{ref * 1000:.3f}', '-', '-'))
+            continue
+        speedup = ref / fast if fast else float('inf')
+        lines.append((name, str(size), f'{ref * 1000:.3f}', f'{fast * 1000:.3f}', f'{speedup:.1f}x'))
+    widths = [max(len(line[i]) for line in lines) for i in range(len(header))]
+    out = []
+    for i, line in enumerate(lines):
+        out.append('  '.join(cell.ljust(widths[j]) if j < 2 else cell.rjust(widths[j])
+                             for j, cell in enumerate(line)))
+        if i == 0:
+            out.append('  '.join('-' * w for w in widths))
+    return '\n'.join(out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cases', type=int, default=200)
+    parser.add_argument('--sizes', default='100,1000,10000,100000')
+    args = parser.parse_args(argv)
+
+    with scratch_progress_store():
+        failures = run_differential(args.seed, args.cases)
+    for name, inputs, expected, actual in failures[:20]:
+        print(f'MISMATCH {name} {inputs!r}: expected {expected!r}, got {actual!r}')
+    if failures:
+        print(f'{len(failures)} mismatches')
+        return 1
+    print(f'{args.cases} random cases match the reference')
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    print()
+    with scratch_progress_store():
+        rows = run_timings(args.seed, sizes)
+    print(format_table(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
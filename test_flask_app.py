@@ -0,0 +1,142 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import flask_app
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    # The words below belong to the centre-A puzzle; don't depend on today's date
+    monkeypatch.setattr(flask_app, 'get_daily_puzzle', lambda: flask_app.PUZZLES[0])
+    return flask_app.app.test_client()
+
+
+def new_client():
+    return flask_app.app.test_client()
+
+
+def count_players(store):
+    with store.connect() as conn:
+        return conn.execute('SELECT COUNT(*) FROM players').fetchone()[0]
+
+
+def test_import_requires_secret_key(tmp_path):
+    env = {k: v for k, v in os.environ.items() if not k.startswith('SPELLSWA_SECRET_KEY')}
+    result = subprocess.run([sys.executable, '-c', 'import flask_app'], env=env,
+                            cwd=os.path.dirname(flask_app.__file__), capture_output=True, text=True)
+    assert result.returncode != 0
+    assert 'SPELLSWA_SECRET_KEY' in result.stderr
+
+    key_file = tmp_path / 'key'
+    key_file.write_text('from-a-file\n')
+    env['SPELLSWA_SECRET_KEY_FILE'] = str(key_file)
+    result = subprocess.run([sys.executable, '-c', 'import flask_app; print(flask_app.app.secret_key)'],
+                            env=env, cwd=os.path.dirname(flask_app.__file__), capture_output=True, text=True)
+    assert result.stdout.strip() == 'from-a-file'
+
+
+def test_players_created_only_when_needed(store, client):
+    assert client.get('/').status_code == 200
+    assert not client.post('/submit', json={'word': 'xyz'}).get_json()['success']
+    assert count_players(store) == 0
+
+    assert client.post('/submit', json={'word': 'mama'}).get_json()['success']
+    assert count_players(store) == 1
+
+    other = new_client()
+    code = other.post('/sync-code').get_json()['code']
+    assert count_players(store) == 2
+    assert code.encode() in other.get('/').data
+
+
+def test_sync_links_devices_and_merges_words(store, client):
+    desktop, phone = client, new_client()
+    phone.post('/submit', json={'word': 'mama'})
+    phone.post('/submit', json={'word': 'chama'})
+    desktop.post('/submit', json={'word': 'mama'})
+    desktop.post('/submit', json={'word': 'baba'})
+    code = desktop.post('/sync-code').get_json()['code']
+
+    assert phone.post('/sync', json={'code': code.lower()}).get_json()['success']
+
+    data = phone.post('/submit', json={'word': 'kama'}).get_json()
+    assert data['found_count'] == 4
+    assert data['score'] == 17
+    assert desktop.post('/submit', json={'word': 'chama'}).get_json() == {
+        'success': False, 'message': '✗ Tayari umeandika neno hili!'}
+    page = desktop.get('/').data.decode()
+    assert all(word in page for word in ['mama', 'baba', 'chama', 'kama'])
+
+
+@pytest.mark.parametrize('body', [{'code': 123}, {}, {'code': None}, {'code': 'ABC'}, ['ABCDEF']])
+def test_sync_rejects_malformed_codes(store, client, body):
+    response = client.post('/sync', json=body)
+    assert response.status_code == 200
+    assert response.get_json() == {'success': False, 'message': '✗ Msimbo si sahihi!'}
+
+
+def test_sync_attempt_limit(store, client):
+    code = new_client().post('/sync-code').get_json()['code']
+    for _ in range(store.SYNC_ATTEMPT_LIMIT):
+        assert client.post('/sync', json={'code': 'ZZZZZZ'}).get_json()['message'] == '✗ Msimbo si sahihi!'
+
+    data = client.post('/sync', json={'code': code}).get_json()
+    assert not data['success']
+    assert 'Majaribio' in data['message']
+
+
+def test_legacy_cookie_progress_carries_over(store, client):
+    with client.session_transaction() as sess:
+        sess['date'] = flask_app.get_today_key()
+        sess['found_words'] = ['chama']
+        sess['score'] = 5
+
+    assert b'chama' in client.get('/').data
+    assert count_players(store) == 0
+    assert client.post('/submit', json={'word': 'chama'}).get_json()['message'] == '✗ Tayari umeandika neno hili!'
+
+    data = client.post('/submit', json={'word': 'mama'}).get_json()
+    assert (data['found_count'], data['score']) == (2, 9)
+    with client.session_transaction() as sess:
+        assert set(sess) == {'player_id', 'sync_code'}
+        player_id = sess['player_id']
+    assert store.load_progress(player_id, flask_app.get_today_key()) == (['chama', 'mama'], 9)
+
+
+def test_stale_legacy_cookie_is_ignored(store, client):
+    with client.session_transaction() as sess:
+        sess['date'] = '2000-01-01'
+        sess['found_words'] = ['chama']
+        sess['score'] = 5
+
+    data = client.post('/submit', json={'word': 'chama'}).get_json()
+    assert (data['found_count'], data['score']) == (1, 5)
+
+
+def test_sync_limit_is_per_client_behind_a_proxy(store, client, monkeypatch):
+    monkeypatch.setattr(flask_app.app, 'wsgi_app', flask_app.app.wsgi_app)
+    flask_app.trust_proxies(flask_app.app, 1)
+    code = new_client().post('/sync-code').get_json()['code']
+
+    # Every request comes from the proxy; only X-Forwarded-For tells clients apart
+    guesser = {'X-Forwarded-For': '203.0.113.7'}
+    for _ in range(store.SYNC_ATTEMPT_LIMIT):
+        client.post('/sync', json={'code': 'ZZZZZZ'}, headers=guesser)
+    assert 'Majaribio' in client.post('/sync', json={'code': code}, headers=guesser).get_json()['message']
+
+    player = new_client()
+    data = player.post('/sync', json={'code': code}, headers={'X-Forwarded-For': '198.51.100.2'}).get_json()
+    assert data == {'success': True, 'message': '✓ Kifaa kimeunganishwa!'}
+
+
+def test_first_request_starts_compactor(store, client, monkeypatch):
+    started = []
+    monkeypatch.setattr(store, 'start_compactor', lambda: started.append(True))
+    monkeypatch.setattr(store, '_compactor_pid', None)
+
+    client.get('/')
+    client.post('/submit', json={'word': 'mama'})
+    assert started == [True]
@@ -0,0 +1,137 @@
+import sqlite3
+
+import pytest
+
+DAY = '2026-10-19'
+EARLIER = '2026-10-18'
+
+
+def events(store, player_id=None):
+    with store.connect() as conn:
+        if player_id is None:
+            rows = conn.execute('SELECT player_id, day, word FROM word_events ORDER BY event_id')
+        else:
+            rows = conn.execute('SELECT player_id, day, word FROM word_events WHERE player_id = ? '
+                                'ORDER BY event_id', (player_id,))
+        return rows.fetchall()
+
+
+def test_create_player_codes(store):
+    player_id, sync_code = store.create_player()
+    assert len(sync_code) == store.SYNC_CODE_LENGTH
+    assert set(sync_code) <= set(store.SYNC_ALPHABET)
+    assert store.find_player(sync_code) == player_id
+    assert store.find_player(f' {sync_code.lower()} ') == player_id
+    assert store.create_player()[0] != player_id
+
+
+@pytest.mark.parametrize('code', [None, 123, '', 'ABC', 'ABCDEFG', ['ABCDEF']])
+def test_find_player_rejects_malformed_codes(store, code):
+    store.create_player()
+    assert store.find_player(code) is None
+
+
+def test_record_words_appends_events_and_updates_snapshot(store):
+    player_id, _ = store.create_player()
+    assert store.load_progress(player_id, DAY) == ([], 0)
+
+    assert store.record_words(player_id, DAY, ['mama', 'chama']) == (['mama', 'chama'], 9, ['mama', 'chama'])
+    assert store.record_word(player_id, DAY, 'mama') == (['mama', 'chama'], 9, False)
+    assert store.record_word(player_id, DAY, 'baba') == (['mama', 'chama', 'baba'], 13, True)
+
+    assert store.load_progress(player_id, DAY) == (['mama', 'chama', 'baba'], 13)
+    assert store.load_progress(player_id, EARLIER) == ([], 0)
+    # Repeats never reach the log
+    assert [word for _, _, word in events(store)] == ['mama', 'chama', 'baba']
+
+
+def test_snapshot_matches_log(store):
+    player_id, _ = store.create_player()
+    for word in ['kama', 'baba', 'kama', 'chama', 'baba', 'hama']:
+        store.record_word(player_id, DAY, word)
+
+    logged = [word for _, day, word in events(store, player_id) if day == DAY]
+    found_words, score = store.load_progress(player_id, DAY)
+    assert found_words == logged
+    assert score == sum(len(word) for word in logged)
+
+
+def test_rebuild_snapshot_folds_unsnapshotted_events(store):
+    player_id, _ = store.create_player()
+    store.record_words(player_id, DAY, ['kama'])
+    with store.connect() as conn:
+        conn.execute("INSERT INTO word_events (player_id, day, word, created_at) VALUES (?, ?, 'hama', '')",
+                     (player_id, DAY))
+
+    assert store.rebuild_snapshot(player_id, DAY) == (['kama', 'hama'], 8)
+    assert store.load_progress(player_id, DAY) == (['kama', 'hama'], 8)
+    assert store.rebuild_snapshot(player_id, DAY) == (['kama', 'hama'], 8)
+
+
+def test_compact_keeps_today_and_drops_covered_past_events(store):
+    player_id, _ = store.create_player()
+    store.record_words(player_id, EARLIER, ['kama', 'kaba'])
+    store.record_words(player_id, DAY, ['mama'])
+    # A past event the snapshot has not seen yet must be folded in, not lost
+    with store.connect() as conn:
+        conn.execute("INSERT INTO word_events (player_id, day, word, created_at) VALUES (?, ?, 'hama', '')",
+                     (player_id, EARLIER))
+
+    assert store.compact(DAY) == 3
+    assert events(store) == [(player_id, DAY, 'mama')]
+    assert store.load_progress(player_id, EARLIER) == (['kama', 'kaba', 'hama'], 12)
+    assert store.load_progress(player_id, DAY) == (['mama'], 4)
+
+    assert store.compact(DAY) == 0
+    # Appends after compaction still land on top of the snapshot
+    store.record_word(player_id, EARLIER, 'chama')
+    assert store.load_progress(player_id, EARLIER) == (['kama', 'kaba', 'hama', 'chama'], 17)
+
+
+def test_sync_failures_block_after_limit(store, monkeypatch):
+    for _ in range(store.SYNC_ATTEMPT_LIMIT - 1):
+        store.record_sync_failure('1.2.3.4')
+    assert not store.sync_blocked('1.2.3.4')
+    store.record_sync_failure('1.2.3.4')
+    assert store.sync_blocked('1.2.3.4')
+    assert not store.sync_blocked('5.6.7.8')
+
+    later = store.time.time() + store.SYNC_ATTEMPT_WINDOW + 1
+    monkeypatch.setattr(store.time, 'time', lambda: later)
+    assert not store.sync_blocked('1.2.3.4')
+    store.compact(DAY)
+    with store.connect() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM sync_failures').fetchone() == (0,)
+
+
+def test_compactor_survives_errors(store, monkeypatch):
+    calls = []
+
+    def compact(day):
+        calls.append(day)
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(store, 'compact', compact)
+    stop = store.start_compactor(interval=0.01)
+    try:
+        deadline = store.time.monotonic() + 5
+        while len(calls) < 3 and store.time.monotonic() < deadline:
+            store.time.sleep(0.01)
+    finally:
+        stop.set()
+    assert len(calls) >= 3
+
+
+def test_ensure_compactor_starts_once_per_process(store, monkeypatch):
+    started = []
+    monkeypatch.setattr(store, 'start_compactor', lambda: started.append(store.os.getpid()))
+    monkeypatch.setattr(store, '_compactor_pid', None)
+
+    store.ensure_compactor()
+    store.ensure_compactor()
+    assert started == [store.os.getpid()]
+
+    # A forked worker has a new pid and needs its own thread
+    monkeypatch.setattr(store, '_compactor_pid', -1)
+    store.ensure_compactor()
+    assert len(started) == 2
@@ -0,0 +1,32 @@
+import pytest
+
+import solver_harness
+
+
+@pytest.fixture(autouse=True)
+def scratch_store():
+    with solver_harness.scratch_progress_store():
+        yield
+
+
+def test_candidates_match_reference():
+    failures = solver_harness.run_differential(seed=1234, cases=40, asgi=False)
+    assert failures == []
+
+
+def test_asgi_matches_reference():
+    pytest.importorskip('quart')
+    failures = solver_harness.run_differential(seed=4321, cases=15, asgi=True)
+    assert failures == []
+
+
+def test_timings_table():
+    rows = solver_harness.run_timings(seed=1234, sizes=[50, 500])
+    table = solver_harness.format_table(rows)
+    print(table)
+
+    names = {name for name, _, _, _ in rows}
+    assert {'get_valid_words cold', 'get_valid_words warm', 'get_rank x1000',
+            'check_word x50', '/submit x50 (route)'} <= names
+    assert all(ref > 0 for _, _, ref, _ in rows)
+    assert '500' in table